@@ -4,22 +4,27 @@ import os, re
 
 POSTS_DIR = "_posts"
 
+TITLE_RE = re.compile(r'title:\s*"?([^"\n]+)"?')
+EXCERPT_RE = re.compile(r'excerpt:\s*"?([^"\n]+)"?')
+CATEGORIES_RE = re.compile(r'^categories:.*$', re.MULTILINE)
+DATE_LINE_RE = re.compile(r'(^date:.*$)', re.MULTILINE)
+
+CATEGORY_KEYWORDS = [
+    ("business", ["invest","stock","market","fund","revenue","profit","ipo","valuation","billion","acquisition","deal","merger","fundrais","raised","worth","price"]),
+    ("money", ["earn","income","salary","job","freelance","passive","side hustle","pay","wage","money","monetiz"]),
+    ("policy", ["regulation","law","policy","government","congress","senate","ban","rule","legislation","antitrust","court","legal","compli"]),
+    ("startups", ["startup","founder","venture","seed","series a","series b","raise","funding","pitch","incubat"]),
+    ("research", ["research","paper","study","benchmark","dataset","training","architecture","university","lab","scientist","arxiv","published"]),
+    ("bigtech", ["robot","hardware","chip","gpu","nvidia","device","phone","autonomous","vehicle","sensor","quantum","processor"]),
+    ("tools", ["tool","plugin","api","agent","assistant","feature","launch","release","update","product","app","platform","software","version"]),
+]
+CATEGORY_RES = [(cat, re.compile("|".join(map(re.escape, words)))) for cat, words in CATEGORY_KEYWORDS]
+
 def get_category(text):
     t = text.lower()
-    if any(w in t for w in ["invest","stock","market","fund","revenue","profit","ipo","valuation","billion","acquisition","deal","merger","fundrais","raised","worth","price"]):
-        return "business"
-    if any(w in t for w in ["earn","income","salary","job","freelance","passive","side hustle","pay","wage","money","monetiz"]):
-        return "money"
-    if any(w in t for w in ["regulation","law","policy","government","congress","senate","ban","rule","legislation","antitrust","court","legal","compli"]):
-        return "policy"
-    if any(w in t for w in ["startup","founder","venture","seed","series a","series b","raise","funding","pitch","incubat"]):
-        return "startups"
-    if any(w in t for w in ["research","paper","study","benchmark","dataset","training","architecture","university","lab","scientist","arxiv","published"]):
-        return "research"
-    if any(w in t for w in ["robot","hardware","chip","gpu","nvidia","device","phone","autonomous","vehicle","sensor","quantum","processor"]):
-        return "bigtech"
-    if any(w in t for w in ["tool","plugin","api","agent","assistant","feature","launch","release","update","product","app","platform","software","version"]):
-        return "tools"
+    for cat, pat in CATEGORY_RES:
+        if pat.search(t):
+            return cat
     return "ai"
 
 def recat_post(filepath):
@@ -27,18 +32,17 @@ def recat_post(filepath):
         content = f.read()
     
     # Extract title and excerpt for categorization
-    title = re.search(r'title:\s*"?([^"\n]+)"?', content)
-    excerpt = re.search(r'excerpt:\s*"?([^"\n]+)"?', content)
+    title = TITLE_RE.search(content)
+    excerpt = EXCERPT_RE.search(content)
     text = (title.group(1) if title else "") + " " + (excerpt.group(1) if excerpt else "")
     
     cat = get_category(text)
     
     # Replace or add categories line
-    if re.search(r'^categories:', content, re.MULTILINE):
-        new_content = re.sub(r'^categories:.*$', f'categories: [{cat}]', content, flags=re.MULTILINE)
-    else:
+    new_content, n = CATEGORIES_RE.subn(f'categories: [{cat}]', content)
+    if not n:
         # Add after 'date:' line
-        new_content = re.sub(r'(^date:.*$)', r'\1\ncategories: [' + cat + ']', content, flags=re.MULTILINE, count=1)
+        new_content = DATE_LINE_RE.sub(r'\1\ncategories: [' + cat + ']', content, count=1)
     
     if new_content != content:
         with open(filepath, "w", encoding="utf-8") as f:
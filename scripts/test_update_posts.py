@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Checks for update_posts.py. Run with pytest or directly: python3 scripts/test_update_posts.py"""
+
+import os, sys, json, tempfile, contextlib
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import update_posts as up
+
+@contextlib.contextmanager
+def patched(**attrs):
+    """Temporarily replace update_posts module attributes."""
+    saved = {k: getattr(up, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(up, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(up, k, v)
+
+def test_canonical_url_drops_only_tracking_params():
+    assert up.canonical_url("https://WWW.Example.com/News/Story/?utm_source=x&id=42&fbclid=y#top") \
+        == "example.com/News/Story?id=42"
+    assert up.canonical_url("https://example.com/a?gclid=1") == "example.com/a"
+
+def test_canonical_url_missing():
+    assert up.canonical_url(None) == ""
+    assert up.canonical_url("") == ""
+
+def fake_claude(stories):
+    """call_claude stand-in: the news search returns `stories`, every article call a fixed body."""
+    def fake(payload, timeout=120, **kw):
+        text = json.dumps(stories) if "tools" in payload else "Body text here.\n\n" * 100
+        return {"content": [{"type": "text", "text": text}]}
+    return fake
+
+def test_null_url_story_does_not_abort_run():
+    stories = [{"title": "Null url story about a new open model release", "url": None, "source": "Ex", "summary": "s"},
+               {"title": "Valid story about an AI chip startup raising money", "url": "https://ex.com/b", "source": "Ex",
+                "summary": "s"}]
+    with tempfile.TemporaryDirectory() as d, patched(POSTS_DIR=d, ANTHROPIC_KEY="x", call_claude=fake_claude(stories)):
+        up.main()
+        assert len(os.listdir(d)) == 2
+
+def test_title_key_strips_lead_in_and_outlet():
+    key = up.title_key("Anthropic ships new model for coding agents")
+    assert up.title_key("Exclusive: Anthropic ships new model for coding agents") == key
+    assert up.title_key("Anthropic ships new model for coding agents | TechCrunch") == key
+    assert up.title_key("Anthropic ships new model for coding agents - The Verge") == key
+    assert up.title_key("Anthropic ships new model for coding agents - Tech news daily", "Tech News Daily") == key
+
+def test_title_key_keeps_headline_halves():
+    for a, b in [("OpenAI - Microsoft deal collapses", "OpenAI - Google deal collapses"),
+                 ("Nvidia earnings - stock soars as AI demand booms",
+                  "Nvidia earnings - what next quarter guidance means for chips"),
+                 ("OpenAI - Microsoft Deal Collapses", "OpenAI - Google Deal Collapses"),
+                 ("Apple Intelligence: Everything you need to know", "ChatGPT: Everything you need to know")]:
+        assert up.title_key(a) != up.title_key(b), (a, b)
+    assert up.title_key("OpenAI - Microsoft deal collapses") == "openai-microsoft-deal-collapses"
+
+def test_version_bumps_are_distinct():
+    for new, old in [("OpenAI launches GPT-5", "OpenAI launches GPT-4"),
+                     ("Google releases Gemini 3", "Google releases Gemini 2")]:
+        assert not up.near_duplicate(up.title_tokens(new), up.title_tokens(old)), (new, old)
+
+def test_company_swap_is_distinct():
+    for new, old in [("Google launches new AI coding agent for developers",
+                      "OpenAI launches new AI coding agent for developers"),
+                     ("Meta signs AI chip deal with AMD", "Meta signs AI chip deal with Nvidia")]:
+        assert not up.near_duplicate(up.title_tokens(new), up.title_tokens(old)), (new, old)
+
+def test_reworded_repeat_is_caught():
+    a = up.title_tokens("Stripe launches Link wallet for AI agents")
+    b = up.title_tokens("Stripe launches Link, a wallet for AI agents")
+    assert up.near_duplicate(a, b)
+    a = up.title_tokens("Acme AI raises $40M Series A to build robot lawyers")
+    b = up.title_tokens("Acme AI raises $40M Series A to build robot lawyers fast")
+    assert up.near_duplicate(a, b)
+
+def test_only_recent_posts_are_compared():
+    with tempfile.TemporaryDirectory() as d:
+        for name, title in [("2026-01-02-gpt-old.md", "OpenAI launches new model for coding agents"),
+                            ("2026-01-09-gpt-new.md", "Anthropic ships new model for coding agents")]:
+            with open(os.path.join(d, name), "w", encoding="utf-8") as f:
+                f.write(f'---\ntitle: "{title}"\n---\n')
+        with patched(POSTS_DIR=d):
+            names, urls, titles, recent = up.load_existing_posts("2026-01-07")
+    assert len(names) == 2 and len(titles) == 2
+    assert recent == [up.title_tokens("Anthropic ships new model for coding agents")]
+
+def test_recent_post_blocks_only_the_same_story():
+    day = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+    stories = [{"title": "OpenAI launches a new AI coding agent for developers", "url": "https://ex.com/a",
+                "source": "Ex", "summary": "s"},
+               {"title": "Google launches new AI coding agent for developers", "url": "https://ex.com/b",
+                "source": "Ex", "summary": "s"}]
+    with tempfile.TemporaryDirectory() as d, patched(POSTS_DIR=d, ANTHROPIC_KEY="x", call_claude=fake_claude(stories)):
+        with open(os.path.join(d, f"{day}-openai-agent.md"), "w", encoding="utf-8") as f:
+            f.write('---\ntitle: "OpenAI launches new AI coding agent for developers"\n---\n')
+        up.main()
+        created = [n for n in os.listdir(d) if not n.endswith("-openai-agent.md")]
+    assert [n[11:] for n in created] == ["google-launches-new-ai-coding-agent-for-developers.md"]
+
+def test_sanitize_flattens_quotes_and_line_breaks():
+    assert up.sanitize(' Says "yes"\r\nthen\u2028a\u2029b\u0085c\n') == "Says 'yes'  then a b c"
+    assert "\n" not in up.yaml_str(up.sanitize("one\u2028two"))
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"ok  {name}")
@@ -3,21 +3,34 @@
 Uses Claude API with web_search to find AND write 750-900 word articles.
 No dependency on NewsAPI or RSS feeds (which were silently failing)."""
 
-import os, re, json, time, hashlib
-from datetime import datetime, timezone
+import os, re, json, time, hashlib, threading, functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-
-try:
-    import requests
-except ImportError:
-    import subprocess
-    subprocess.run(["pip","install","requests","--break-system-packages","-q"])
-    import requests
+from urllib.parse import urlsplit, parse_qsl, urlencode
 
 POSTS_DIR = "_posts"
 ANTHROPIC_KEY = os.environ.get("ANTHROPIC_API_KEY","")
 API_URL = "https://api.anthropic.com/v1/messages"
 HEADERS = {"x-api-key": ANTHROPIC_KEY, "anthropic-version": "2023-06-01", "content-type": "application/json"}
+MAX_WORKERS = 4  # concurrent article generations (each call is network-bound)
+API_MIN_INTERVAL = 1.0  # seconds between request starts to the API host
+MAX_RATE_LIMIT_WAIT = 60  # cap on a header-driven pause, in seconds
+TRACKING_PARAMS = {"fbclid", "gclid"}  # plus any utm_* key
+NEAR_DUP_JACCARD = 0.6  # content-word overlap at which two titles with the same names count as one story
+TITLE_STOPWORDS = frozenset("a an the and or of for to in on at by with from as is are its into".split())
+NEAR_DUP_DAYS = 3  # published posts this recent are checked for near-duplicate titles
+
+SLUG_DROP_RE = re.compile(r'[^\w\s-]')
+SLUG_DASH_RE = re.compile(r'[-\s]+')
+SOURCE_URL_RE = re.compile(r'^source_url:\s*"?([^"\n]+)"?', re.MULTILINE)
+TITLE_RE = re.compile(r'^title:\s*"?([^"\n]+)"?', re.MULTILINE)
+LEAD_IN_RE = re.compile(r'^(?:exclusive|breaking|scoop|updated?)\s*:\s*', re.IGNORECASE)
+NAME_RE = re.compile(r'\b[A-Za-z]*[A-Z][A-Za-z]*')  # any word with a capital: OpenAI, Google, xAI, iPhone
+OUTLET_RE = re.compile(r'\s*(?:\||\s-\s)\s*((?:(?!\||\s-\s).)*)$')  # from the last '|' or ' - ' to the end
+JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+SANITIZE_TABLE = str.maketrans({'"': "'", "\n": " ", "\r": " ", "\u2028": " ", "\u2029": " ", "\u0085": " "})
 
 IMAGES = [
     "https://images.pexels.com/photos/8386440/pexels-photo-8386440.jpeg?auto=compress&cs=tinysrgb&dpr=2&h=650&w=940",
@@ -32,45 +45,177 @@ IMAGES = [
     "https://images.pexels.com/photos/8438918/pexels-photo-8438918.jpeg?auto=compress&cs=tinysrgb&dpr=2&h=650&w=940",
 ]
 
+CATEGORY_KEYWORDS = [
+    ("business", ["invest","revenue","profit","ipo","valuation","billion","acquisition","merger","fundrais","raised","funding round","deal"]),
+    ("money", ["earn","income","salary","job","freelance","passive","side hustle","wage","money","monetiz","career"]),
+    ("policy", ["regulation","law","policy","government","congress","senate","ban","rule","legislation","antitrust","court","legal"]),
+    ("startups", ["startup","founder","venture","seed","series a","series b","pitch","incubat"]),
+    ("research", ["research","paper","study","benchmark","dataset","training","architecture","university","lab","arxiv","published"]),
+    ("bigtech", ["google","microsoft","meta","amazon","apple","nvidia","openai","anthropic","chip","hardware","bigtech"]),
+    ("tools", ["tool","plugin","api","agent","assistant","feature","launch","release","update","product","app","platform","software"]),
+]
+# One alternation per tier: a single regex scan replaces an any() loop of substring checks
+CATEGORY_RES = [(cat, re.compile("|".join(map(re.escape, words)))) for cat, words in CATEGORY_KEYWORDS]
+
 def get_category(text):
     t = text.lower()
-    if any(w in t for w in ["invest","revenue","profit","ipo","valuation","billion","acquisition","merger","fundrais","raised","funding round","deal"]):
-        return "business"
-    if any(w in t for w in ["earn","income","salary","job","freelance","passive","side hustle","wage","money","monetiz","career"]):
-        return "money"
-    if any(w in t for w in ["regulation","law","policy","government","congress","senate","ban","rule","legislation","antitrust","court","legal"]):
-        return "policy"
-    if any(w in t for w in ["startup","founder","venture","seed","series a","series b","pitch","incubat"]):
-        return "startups"
-    if any(w in t for w in ["research","paper","study","benchmark","dataset","training","architecture","university","lab","arxiv","published"]):
-        return "research"
-    if any(w in t for w in ["google","microsoft","meta","amazon","apple","nvidia","openai","anthropic","chip","hardware","bigtech"]):
-        return "bigtech"
-    if any(w in t for w in ["tool","plugin","api","agent","assistant","feature","launch","release","update","product","app","platform","software"]):
-        return "tools"
+    for cat, pat in CATEGORY_RES:
+        if pat.search(t):
+            return cat
     return "ai"
 
 def get_image(title):
-    idx = int(hashlib.md5(title.encode()).hexdigest(),16) % len(IMAGES)
+    # Raw digest -> int gives the same index as int(hexdigest, 16) without the hex round-trip
+    idx = int.from_bytes(hashlib.md5(title.encode()).digest(), "big") % len(IMAGES)
     return IMAGES[idx]
 
+@functools.lru_cache(maxsize=256)  # each title is slugged for dedupe, near-dup tokens, post_exists and the filename
 def slugify(title):
     s = title.lower()
-    s = re.sub(r'[^\w\s-]','',s)
-    s = re.sub(r'[-\s]+','-',s).strip('-')
+    s = SLUG_DROP_RE.sub('',s)
+    s = SLUG_DASH_RE.sub('-',s).strip('-')
     return s[:60]
 
-def post_exists(title):
-    slug = slugify(title)
-    for f in Path(POSTS_DIR).glob("*.md"):
-        if slug[:30] in f.name:
-            return True
-    return False
-
-def call_claude(payload, timeout=120):
-    r = requests.post(API_URL, headers=HEADERS, json=payload, timeout=timeout)
+def canonical_url(url):
+    """Host + path + non-tracking query; only the host is lowercased, since paths and ids are case-sensitive.
+    A missing or non-string url (the model sometimes returns null) gives ''."""
+    if not isinstance(url, str):
+        return ""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not (k.lower().startswith("utm_") or k.lower() in TRACKING_PARAMS)]
+    key = parts.netloc.lower().removeprefix("www.") + parts.path.rstrip("/")
+    return f"{key}?{urlencode(query)}" if query else key
+
+def title_tokens(title):
+    """(words, numbers, names) of a headline, stopwords dropped. Any slug token with a digit is a number
+    ('4', '50b', 'v2'); any capitalised word is a name, so 'OpenAI launches X' and 'Google launches X' differ."""
+    toks = frozenset(slugify(title).split("-")) - TITLE_STOPWORDS
+    nums = frozenset(t for t in toks if any(c.isdigit() for c in t))
+    names = frozenset(w.lower() for w in NAME_RE.findall(title)) - TITLE_STOPWORDS
+    return toks - nums, nums, names
+
+def jaccard(a, b):
+    return len(a & b) / max(1, len(a | b))
+
+def near_duplicate(a, b):
+    """Same story: identical numbers (GPT-4 vs GPT-5 are different releases), identical names (a rival's
+    launch is its own story) and enough overlap in the remaining words."""
+    return a[1] == b[1] and a[2] == b[2] and jaccard(a[0], b[0]) >= NEAR_DUP_JACCARD
+
+def is_outlet(segment, head, source=""):
+    """Whether a headline's trailing segment is a publication name rather than the second half of the headline:
+    the story's source, or one to three capitalised words ('Reuters', 'The Verge') after a headline of 4+ words."""
+    if source and slugify(segment) == slugify(source):
+        return True
+    words = segment.split()
+    return 1 <= len(words) <= 3 and not any(w[0].islower() for w in words) and len(head.split()) >= 4
+
+def title_key(title, source=""):
+    """Slug of the headline minus a known lead-in and a trailing outlet, so 'Exclusive: X' and 'X | Outlet' share a key."""
+    t = LEAD_IN_RE.sub("", title.strip())
+    m = OUTLET_RE.search(t)
+    if m and m.start() and is_outlet(m.group(1), t[:m.start()], source):
+        t = t[:m.start()]
+    return slugify(t)
+
+def load_existing_posts(since):
+    """Filenames, canonical source URLs and title keys of published posts, plus title tokens of those dated on or
+    after `since` (YYYY-MM-DD), read in one directory scan per run."""
+    names, urls, titles, recent = set(), set(), set(), []
+    if not os.path.isdir(POSTS_DIR):
+        return frozenset(names), urls, titles, recent
+    for e in os.scandir(POSTS_DIR):
+        if not e.name.endswith(".md"):
+            continue
+        names.add(e.name)
+        with open(e.path, encoding="utf-8") as f:
+            head = f.read(4096)  # front matter only
+        m = SOURCE_URL_RE.search(head)
+        if m:
+            urls.add(canonical_url(m.group(1)))
+        m = TITLE_RE.search(head)
+        if m:
+            titles.add(title_key(m.group(1)))
+            if e.name[:10] >= since:  # filenames start with the post date
+                recent.append(title_tokens(m.group(1)))
+    return frozenset(names), urls, titles, recent
+
+def post_exists(slug, existing):
+    prefix = slug[:30]
+    return any(prefix in name for name in existing)
+
+def load_requests():
+    """Import requests on first use (installing it if missing), so a run without a key exits before paying for it."""
+    try:
+        import requests
+    except ImportError:
+        import subprocess
+        subprocess.run(["pip","install","requests","--break-system-packages","-q"])
+        import requests
+    return requests
+
+_session = None
+
+def get_session():
+    """One keep-alive session for every API call, with retry/backoff on rate limits and overload."""
+    global _session
+    if _session is None:
+        requests = load_requests()
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        # Every retry re-sends a paid POST, so only retry what the API rejects before doing any work:
+        # 429 rate limit and 529 overloaded. read=0 and no 5xx: a timeout or gateway error may follow a finished generation
+        retry = Retry(total=2, read=0, backoff_factor=2, status_forcelist=[429,529],
+                      allowed_methods=frozenset(["POST"]), raise_on_status=False)
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+        _session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS, max_retries=retry))
+    return _session
+
+_print_lock = threading.Lock()
+
+def log(msg):
+    """print() for worker threads: one line at a time, never spliced with another worker's output."""
+    with _print_lock:
+        print(msg, flush=True)
+
+def log_tag(title):
+    """Short per-story prefix, so interleaved worker output can be tied back to its story."""
+    return f"[{title[:40]}] "
+
+_throttle_lock = threading.Lock()
+_next_slot = 0.0
+
+def throttle():
+    """Space request starts API_MIN_INTERVAL apart so parallel workers don't burst into a 429."""
+    global _next_slot
+    with _throttle_lock:
+        now = time.monotonic()
+        wait = _next_slot - now
+        _next_slot = max(now, _next_slot) + API_MIN_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+def defer_on_rate_limit(headers):
+    """When the API reports no requests left in the window, hold every worker's next start until it resets."""
+    global _next_slot
+    if headers.get("anthropic-ratelimit-requests-remaining") != "0":
+        return
+    try:
+        reset = datetime.fromisoformat(headers["anthropic-ratelimit-requests-reset"].replace("Z","+00:00"))
+    except (KeyError, ValueError):
+        return
+    wait = min((reset - datetime.now(timezone.utc)).total_seconds(), MAX_RATE_LIMIT_WAIT)
+    with _throttle_lock:
+        _next_slot = max(_next_slot, time.monotonic() + wait)
+
+def call_claude(payload, timeout=120, label=""):
+    throttle()
+    r = get_session().post(API_URL, json=payload, timeout=timeout)
+    defer_on_rate_limit(r.headers)
     if r.status_code != 200:
-        print(f"  API ERROR {r.status_code}: {r.text[:300]}")
+        log(f"  {label}API ERROR {r.status_code}: {r.text[:300]}")
         return None
     return r.json()
 
@@ -104,9 +249,9 @@ The "url" must be a real, working URL to the original source article you found."
         print("  No text returned from news search call")
         return []
 
+    # The array search also skips any ```json fences, so no separate strip pass is needed
     text = text.strip()
-    text = re.sub(r'^```json\s*|\s*```$', '', text, flags=re.MULTILINE).strip()
-    match = re.search(r'\[.*\]', text, re.DOTALL)
+    match = JSON_ARRAY_RE.search(text)
     if not match:
         print(f"  Could not find JSON array in response. First 300 chars: {text[:300]}")
         return []
@@ -156,48 +301,66 @@ RULES:
         "model": "claude-opus-4-5",
         "max_tokens": 1400,
         "messages": [{"role": "user", "content": prompt}]
-    }, timeout=90)
+    }, timeout=90, label=log_tag(title))
 
     text = extract_text(data)
     if text:
         return text.strip()
     return f"{summary}\n\nThis story represents a significant development in the AI landscape. Stay tuned to The AI Pulse Hub for continued coverage."
 
+def yaml_str(s):
+    """Double-quoted YAML scalar (JSON strings are valid YAML; escapes backslashes and control chars)."""
+    return json.dumps(s, ensure_ascii=False)
+
+def sanitize(text):
+    """Front-matter text: double quotes become apostrophes and line breaks spaces, in one translate pass."""
+    return text.translate(SANITIZE_TABLE).strip()
+
 def make_excerpt(content):
-    clean = re.sub(r'<[^>]+>','',content)
+    clean = TAG_RE.sub('',content) if '<' in content else content
     clean = ' '.join(clean.split())
     s = clean[:155]
     return (s.rsplit(' ',1)[0]+'...') if len(clean)>155 else clean
 
-def build_post(article):
-    title = article["title"].strip().replace('"',"'")
-    if post_exists(title):
-        print(f"  Skip (exists): {title[:50]}")
+def write_atomic(path, text):
+    """Write to a hidden temp file and os.replace it, so a killed run never leaves a half-written post."""
+    head, name = os.path.split(path)
+    tmp = os.path.join(head, f".{name}.tmp")
+    Path(tmp).write_bytes(text.encode("utf-8"))
+    os.replace(tmp, path)
+
+def build_post(article, existing, date_str):
+    title = sanitize(article["title"])
+    tag = log_tag(title)
+    slug = slugify(title)
+    if post_exists(slug, existing):
+        log(f"  {tag}Skip (exists)")
         return False
 
-    print(f"  Generating article...")
-    content = generate_article(title, article.get("summary",""), article.get("url",""), article.get("source",""))
+    summary = article.get("summary","")
+    source_url = article.get("url") or ""
+    source = article.get("source","")
+
+    log(f"  {tag}Generating article...")
+    content = generate_article(title, summary, source_url, source)
     excerpt = make_excerpt(content)
-    cat = get_category(title+" "+article.get("summary",""))
+    cat = get_category(title+" "+summary)
     image = get_image(title)
-    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    slug = slugify(title)
     fname = f"{date_str}-{slug}.md"
     words = len(content.split())
     read_time = max(3, round(words/200))
-    safe_excerpt = excerpt.replace('"',"'")
-    source_url = article.get('url','')
-    source_name = article.get('source','Source')
+    safe_excerpt = sanitize(excerpt)
+    source_name = source or "Source"
 
     post = f"""---
 layout: post
-title: "{title}"
+title: {yaml_str(title)}
 date: {date_str}
 categories: [{cat}]
-excerpt: "{safe_excerpt}"
+excerpt: {yaml_str(safe_excerpt)}
 image: {image}
 reading_time: {read_time}
-source_url: "{source_url}"
+source_url: {yaml_str(source_url)}
 author: "The AI Pulse Hub Editorial Team"
 ---
 
@@ -207,14 +370,22 @@ author: "The AI Pulse Hub Editorial Team"
 *Originally reported by [{source_name}]({source_url}). The AI Pulse Hub provides independent analysis and commentary.*
 """
     Path(POSTS_DIR).mkdir(exist_ok=True)
-    with open(f"{POSTS_DIR}/{fname}","w",encoding="utf-8") as f:
-        f.write(post)
-    print(f"  Created: {fname} ({read_time} min, {words} words, cat:{cat})")
+    write_atomic(f"{POSTS_DIR}/{fname}", post)
+    log(f"  {tag}Created: {fname} ({read_time} min, {words} words, cat:{cat})")
     return True
 
+def process_article(article, existing, date_str):
+    log(f"\nProcessing: {article['title'][:70]}")
+    try:
+        return build_post(article, existing, date_str)
+    except Exception as e:
+        log(f"  {log_tag(sanitize(article['title']))}Error: {e}")
+        return False
+
 def main():
     print("=== AI Pulse Hub Article Generator v2 ===")
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}")
+    run_now = datetime.now(timezone.utc)
+    print(f"Time: {run_now.strftime('%Y-%m-%d %H:%M UTC')}")
     if not ANTHROPIC_KEY:
         print("FATAL: ANTHROPIC_API_KEY not set. Exiting.")
         return
@@ -222,22 +393,35 @@ def main():
     articles = fetch_news_via_claude()
     print(f"Found {len(articles)} candidate stories")
 
+    since = (run_now.date() - timedelta(days=NEAR_DUP_DAYS)).isoformat()
+    existing, known_urls, known_titles, recent_tokens = load_existing_posts(since)
     seen, unique = set(), []
     for a in articles:
-        k = slugify(a["title"])
+        k = slugify(a["title"])[:30]  # post_exists prefix; keeps workers off the same slug
+        u = canonical_url(a.get("url"))
+        if u and u in known_urls:
+            print(f"  Skip (source already covered): {a['title'][:50]}")
+            continue
+        tk = title_key(a["title"], str(a.get("source") or ""))
+        if tk and tk in known_titles:
+            print(f"  Skip (headline already covered): {a['title'][:50]}")
+            continue
+        toks = title_tokens(a["title"])
+        # Compared with the last few days' posts as well as this batch, so reworded repeats of a story are caught
+        if any(near_duplicate(toks, t) for t in recent_tokens):
+            print(f"  Skip (near-duplicate): {a['title'][:50]}")
+            continue
         if k not in seen:
             seen.add(k)
+            known_urls.add(u)
+            known_titles.add(tk)
+            recent_tokens.append(toks)
             unique.append(a)
 
-    created = 0
-    for a in unique[:8]:
-        print(f"\nProcessing: {a['title'][:70]}")
-        try:
-            if build_post(a):
-                created += 1
-            time.sleep(1)
-        except Exception as e:
-            print(f"  Error: {e}")
+    # One date per run: posts generated either side of midnight UTC still land on the same day
+    date_str = run_now.date().isoformat()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        created = sum(ex.map(lambda a: process_article(a, existing, date_str), unique[:8]))
 
     print(f"\nDone. Created {created} posts.")
 